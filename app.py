@@ -9,6 +9,10 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, date
 import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.parquet as pq
+import io
+import uuid
 import sys
 import os
 
@@ -18,7 +22,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 from aeronet_api import AeronetAPI
 from data_processor import AeronetDataProcessor
 from plotting import AeronetPlotter
-from config.settings import DATA_LEVELS, AVG_TYPES, AOD_WAVELENGTHS
+from data_cache import AeronetDataCache
+from config.settings import DATA_LEVELS, AVG_TYPES, AOD_WAVELENGTHS, CACHE_EXPIRY_HOURS
+
+# Selectbox options, built once rather than on every rerun
+DATA_LEVEL_KEYS = tuple(DATA_LEVELS.keys())
+AVG_TYPE_KEYS = tuple(AVG_TYPES.keys())
 
 # Page configuration
 st.set_page_config(
@@ -28,34 +37,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .metric-container {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-    }
-    .stSelectbox > label {
-        font-weight: bold;
-    }
-    .info-box {
-        background-color: #e7f3ff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def load_css() -> str:
+    """Load the app stylesheet from the assets directory."""
+    css_path = os.path.join(os.path.dirname(__file__), 'assets', 'style.css')
+    with open(css_path) as f:
+        return f.read()
 
 @st.cache_resource
 def initialize_clients():
@@ -63,11 +50,172 @@ def initialize_clients():
     api = AeronetAPI()
     processor = AeronetDataProcessor()
     plotter = AeronetPlotter()
-    return api, processor, plotter
+    data_cache = AeronetDataCache()
+    return api, processor, plotter, data_cache
+
+@st.cache_data(ttl=CACHE_EXPIRY_HOURS * 3600, show_spinner=False, max_entries=32)
+def export_data(_display_data: pd.DataFrame, download_id: str, wavelengths: tuple):
+    """Serialize displayed data to CSV and Parquet bytes, cached per download and wavelength set."""
+    table = pa.Table.from_pandas(_display_data, preserve_index=False)
+    
+    # pandas keeps the original CSV layout (unquoted header and timestamps)
+    csv_data = _display_data.to_csv(index=False).encode()
+    
+    parquet_buffer = io.BytesIO()
+    pq.write_table(table, parquet_buffer)
+    
+    return csv_data, parquet_buffer.getvalue()
+
+def render_metrics(metrics: list):
+    """Render (label, value) metric pairs side by side in a single row of columns."""
+    cols = st.columns(len(metrics))
+    for col, (label, value) in zip(cols, metrics):
+        col.metric(label, value)
+
+@st.fragment
+def render_results(aod_data: pd.DataFrame, params: dict, download_id: str, processor, plotter):
+    """Render wavelength-dependent plots, statistics and tables for downloaded data."""
+    # Main visualization
+    st.subheader("📈 AOD Time Series")
+    
+    # Wavelength selection
+    selected_wavelengths = st.multiselect(
+        "🌈 Select wavelengths (nm)",
+        options=AOD_WAVELENGTHS,
+        default=[440, 500, 675],
+        key="selected_wavelengths",
+        help="Choose which AOD wavelengths to display"
+    )
+    
+    if not selected_wavelengths:
+        st.warning("Please select at least one wavelength.")
+        return
+    
+    # Extract AOD columns
+    aod_columns = processor.extract_aod_columns(aod_data)
+    
+    # Valid-value masks, computed once and shared by the plot and quality sections
+    masks = {w: aod_data[aod_columns[w]].notna().to_numpy()
+             for w in selected_wavelengths if w in aod_columns}
+    valid_counts = {w: int(m.sum()) for w, m in masks.items()}
+    
+    # Create time series plot
+    plot_title = f"Aerosol Optical Depth - {params.get('site', 'Unknown Site')}"
+    timeseries_fig = plotter.plot_aod_timeseries(
+        aod_data, aod_columns, selected_wavelengths, plot_title, masks=masks
+    )
+    st.plotly_chart(timeseries_fig, use_container_width=True)
+    
+    # Statistics section
+    if len(selected_wavelengths) > 1:
+        st.subheader("📊 Statistical Summary")
+        
+        # Calculate statistics for each wavelength
+        stats_dict = processor.calculate_statistics_batch(aod_data, selected_wavelengths)
+        
+        # Display statistics table
+        stats_rows = []
+        for wavelength in selected_wavelengths:
+            if wavelength in stats_dict and stats_dict[wavelength]:
+                stats = stats_dict[wavelength]
+                stats_rows.append({
+                    'Wavelength (nm)': wavelength,
+                    'Count': stats['count'],
+                    'Mean': f"{stats['mean']:.3f}",
+                    'Median': f"{stats['median']:.3f}",
+                    'Std Dev': f"{stats['std']:.3f}",
+                    'Min': f"{stats['min']:.3f}",
+                    'Max': f"{stats['max']:.3f}"
+                })
+        
+        if stats_rows:
+            stats_df = pd.DataFrame(stats_rows)
+            st.dataframe(stats_df, use_container_width=True)
+            
+            # Box plot for statistics
+            if len(selected_wavelengths) > 1:
+                stats_fig = plotter.plot_aod_statistics(stats_dict, selected_wavelengths)
+                st.plotly_chart(stats_fig, use_container_width=True)
+    
+    # Data table section
+    with st.expander("🔍 View Raw Data", expanded=False):
+        st.subheader("Raw Data Table")
+        
+        # Show relevant columns
+        display_cols = ['datetime'] if 'datetime' in aod_data.columns else []
+        display_cols.extend([aod_columns[w] for w in selected_wavelengths if w in aod_columns])
+        
+        if display_cols:
+            display_data = aod_data[display_cols].copy()
+            
+            # Format datetime for display
+            if 'datetime' in display_data.columns:
+                display_data['datetime'] = display_data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            
+            st.dataframe(display_data, use_container_width=True)
+            
+            # Download buttons for CSV and Parquet
+            csv_data, parquet_data = export_data(display_data, download_id, tuple(selected_wavelengths))
+            file_stem = f"aeronet_{params.get('site', 'data')}_{params.get('start_date', '')}_to_{params.get('end_date', '')}"
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    label="📥 Download Data as CSV",
+                    data=csv_data,
+                    file_name=f"{file_stem}.csv",
+                    mime="text/csv"
+                )
+            with col2:
+                st.download_button(
+                    label="📥 Download Data as Parquet",
+                    data=parquet_data,
+                    file_name=f"{file_stem}.parquet",
+                    mime="application/octet-stream"
+                )
+    
+    # Analysis section
+    with st.expander("🔬 Data Analysis", expanded=False):
+        st.subheader("Data Quality Assessment")
+        
+        # Data completeness
+        total_possible = len(aod_data)
+        completeness_data = []
+        
+        for wavelength in selected_wavelengths:
+            if wavelength in valid_counts:
+                valid_count = valid_counts[wavelength]
+                completeness = (valid_count / total_possible) * 100 if total_possible > 0 else 0
+                completeness_data.append({
+                    'Wavelength (nm)': wavelength,
+                    'Valid Measurements': valid_count,
+                    'Total Possible': total_possible,
+                    'Completeness (%)': f"{completeness:.1f}%"
+                })
+        
+        if completeness_data:
+            completeness_df = pd.DataFrame(completeness_data)
+            st.dataframe(completeness_df, use_container_width=True)
+        
+        # Temporal coverage
+        if 'datetime' in aod_data.columns:
+            st.subheader("Temporal Coverage")
+            first_measurement = aod_data['datetime'].min()
+            last_measurement = aod_data['datetime'].max()
+            total_days = (last_measurement - first_measurement).days + 1
+            
+            render_metrics([
+                ("First Measurement", first_measurement.strftime('%Y-%m-%d %H:%M')),
+                ("Last Measurement", last_measurement.strftime('%Y-%m-%d %H:%M')),
+                ("Time Span (days)", total_days)
+            ])
 
 def main():
     """Main application function."""
     
+    # Custom CSS
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+    
     # Header
     st.markdown('<h1 class="main-header">🌍 AERONET Data Explorer</h1>', unsafe_allow_html=True)
     
@@ -80,7 +228,7 @@ def main():
     """, unsafe_allow_html=True)
     
     # Initialize clients
-    api, processor, plotter = initialize_clients()
+    api, processor, plotter, data_cache = initialize_clients()
     
     # Sidebar for controls
     with st.sidebar:
@@ -133,7 +281,7 @@ def main():
         
         data_level = st.selectbox(
             "Data Quality Level",
-            options=list(DATA_LEVELS.keys()),
+            options=DATA_LEVEL_KEYS,
             format_func=lambda x: DATA_LEVELS[x],
             index=1,  # Default to Level 1.5
             help="Level 1.5 (cloud-screened) is recommended for most users"
@@ -141,24 +289,11 @@ def main():
         
         avg_type = st.selectbox(
             "Averaging Type",
-            options=list(AVG_TYPES.keys()),
+            options=AVG_TYPE_KEYS,
             format_func=lambda x: AVG_TYPES[x],
             help="All points shows individual measurements, daily averages shows daily means"
         )
         
-        # Wavelength selection
-        st.subheader("🌈 Wavelengths")
-        selected_wavelengths = st.multiselect(
-            "Select wavelengths (nm)",
-            options=AOD_WAVELENGTHS,
-            default=[440, 500, 675],
-            help="Choose which AOD wavelengths to display"
-        )
-        
-        if not selected_wavelengths:
-            st.warning("Please select at least one wavelength.")
-            return
-        
         # Download button
         download_data = st.button(
             "📥 Download Data",
@@ -194,8 +329,8 @@ def main():
         1. **Select a site** from the dropdown in the sidebar
         2. **Choose your date range** (up to several months recommended)
         3. **Configure data parameters** (quality level, averaging type)
-        4. **Select wavelengths** you want to analyze
-        5. **Click "Download Data"** to retrieve and visualize the data
+        4. **Click "Download Data"** to retrieve and visualize the data
+        5. **Select wavelengths** you want to analyze above the time series plot
         
         ### 📊 Data Quality Levels
         - **Level 1.0**: Raw, unscreened data
@@ -210,33 +345,44 @@ def main():
             # Download new data
             with st.spinner(f"Downloading data for {selected_site}..."):
                 try:
-                    raw_data = api.get_aod_data(
-                        start_date=start_date.strftime('%Y-%m-%d'),
-                        end_date=end_date.strftime('%Y-%m-%d'),
-                        site=selected_site,
-                        data_level=data_level,
-                        avg_type=avg_type
-                    )
-                    
-                    if raw_data.empty:
-                        st.error(f"No data available for {selected_site} in the selected date range.")
-                        return
-                    
-                    # Process data
-                    clean_data = processor.clean_data(raw_data)
-                    
-                    # Store in session state
-                    st.session_state['aod_data'] = clean_data
-                    st.session_state['download_params'] = {
+                    download_params = {
                         'site': selected_site,
                         'start_date': start_date,
                         'end_date': end_date,
                         'data_level': data_level,
-                        'avg_type': avg_type,
-                        'wavelengths': selected_wavelengths
+                        'avg_type': avg_type
                     }
                     
-                    st.success(f"Successfully downloaded {len(clean_data)} data points!")
+                    # Reuse cleaned data from a previous session if available
+                    clean_data = data_cache.load(download_params)
+                    from_cache = clean_data is not None
+                    
+                    if not from_cache:
+                        raw_data = api.get_aod_data(
+                            start_date=start_date.strftime('%Y-%m-%d'),
+                            end_date=end_date.strftime('%Y-%m-%d'),
+                            site=selected_site,
+                            data_level=data_level,
+                            avg_type=avg_type
+                        )
+                        
+                        if raw_data.empty:
+                            st.error(f"No data available for {selected_site} in the selected date range.")
+                            return
+                        
+                        # Process data
+                        clean_data = processor.clean_data(raw_data)
+                        data_cache.save(download_params, clean_data)
+                    
+                    # Store in session state
+                    st.session_state['aod_data'] = clean_data
+                    st.session_state['download_params'] = download_params
+                    st.session_state['download_id'] = uuid.uuid4().hex
+                    
+                    if from_cache:
+                        st.success(f"Loaded {len(clean_data)} data points from the local cache.")
+                    else:
+                        st.success(f"Successfully downloaded {len(clean_data)} data points!")
                     
                 except Exception as e:
                     st.error(f"Error downloading data: {str(e)}")
@@ -250,130 +396,19 @@ def main():
             st.warning("No data to display.")
             return
         
-        # Extract AOD columns
-        aod_columns = processor.extract_aod_columns(aod_data)
-        
         # Display data summary
         st.subheader("📊 Data Summary")
         
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Records", len(aod_data))
-        with col2:
-            st.metric("Site", params.get('site', 'Unknown'))
-        with col3:
-            st.metric("Data Level", DATA_LEVELS.get(params.get('data_level', '15')))
-        with col4:
-            date_range = f"{params.get('start_date', 'N/A')} to {params.get('end_date', 'N/A')}"
-            st.metric("Date Range", date_range)
-        
-        # Main visualization
-        st.subheader("📈 AOD Time Series")
-        
-        # Create time series plot
-        plot_title = f"Aerosol Optical Depth - {params.get('site', 'Unknown Site')}"
-        timeseries_fig = plotter.plot_aod_timeseries(
-            aod_data, aod_columns, selected_wavelengths, plot_title
-        )
-        st.plotly_chart(timeseries_fig, use_container_width=True)
+        date_range = f"{params.get('start_date', 'N/A')} to {params.get('end_date', 'N/A')}"
+        render_metrics([
+            ("Total Records", len(aod_data)),
+            ("Site", params.get('site', 'Unknown')),
+            ("Data Level", DATA_LEVELS.get(params.get('data_level', '15'))),
+            ("Date Range", date_range)
+        ])
         
-        # Statistics section
-        if len(selected_wavelengths) > 1:
-            st.subheader("📊 Statistical Summary")
-            
-            # Calculate statistics for each wavelength
-            stats_dict = {}
-            for wavelength in selected_wavelengths:
-                stats_dict[wavelength] = processor.calculate_statistics(aod_data, wavelength)
-            
-            # Display statistics table
-            stats_rows = []
-            for wavelength in selected_wavelengths:
-                if wavelength in stats_dict and stats_dict[wavelength]:
-                    stats = stats_dict[wavelength]
-                    stats_rows.append({
-                        'Wavelength (nm)': wavelength,
-                        'Count': stats['count'],
-                        'Mean': f"{stats['mean']:.3f}",
-                        'Median': f"{stats['median']:.3f}",
-                        'Std Dev': f"{stats['std']:.3f}",
-                        'Min': f"{stats['min']:.3f}",
-                        'Max': f"{stats['max']:.3f}"
-                    })
-            
-            if stats_rows:
-                stats_df = pd.DataFrame(stats_rows)
-                st.dataframe(stats_df, use_container_width=True)
-                
-                # Box plot for statistics
-                if len(selected_wavelengths) > 1:
-                    stats_fig = plotter.plot_aod_statistics(stats_dict, selected_wavelengths)
-                    st.plotly_chart(stats_fig, use_container_width=True)
-        
-        # Data table section
-        with st.expander("🔍 View Raw Data", expanded=False):
-            st.subheader("Raw Data Table")
-            
-            # Show relevant columns
-            display_cols = ['datetime'] if 'datetime' in aod_data.columns else []
-            display_cols.extend([aod_columns[w] for w in selected_wavelengths if w in aod_columns])
-            
-            if display_cols:
-                display_data = aod_data[display_cols].copy()
-                
-                # Format datetime for display
-                if 'datetime' in display_data.columns:
-                    display_data['datetime'] = display_data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
-                
-                st.dataframe(display_data, use_container_width=True)
-                
-                # Download button for CSV
-                csv_data = display_data.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Data as CSV",
-                    data=csv_data,
-                    file_name=f"aeronet_{params.get('site', 'data')}_{params.get('start_date', '')}_to_{params.get('end_date', '')}.csv",
-                    mime="text/csv"
-                )
-        
-        # Analysis section
-        with st.expander("🔬 Data Analysis", expanded=False):
-            st.subheader("Data Quality Assessment")
-            
-            # Data completeness
-            total_possible = len(aod_data)
-            completeness_data = []
-            
-            for wavelength in selected_wavelengths:
-                if wavelength in aod_columns:
-                    col_name = aod_columns[wavelength]
-                    valid_count = aod_data[col_name].notna().sum()
-                    completeness = (valid_count / total_possible) * 100 if total_possible > 0 else 0
-                    completeness_data.append({
-                        'Wavelength (nm)': wavelength,
-                        'Valid Measurements': valid_count,
-                        'Total Possible': total_possible,
-                        'Completeness (%)': f"{completeness:.1f}%"
-                    })
-            
-            if completeness_data:
-                completeness_df = pd.DataFrame(completeness_data)
-                st.dataframe(completeness_df, use_container_width=True)
-            
-            # Temporal coverage
-            if 'datetime' in aod_data.columns:
-                st.subheader("Temporal Coverage")
-                first_measurement = aod_data['datetime'].min()
-                last_measurement = aod_data['datetime'].max()
-                total_days = (last_measurement - first_measurement).days + 1
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("First Measurement", first_measurement.strftime('%Y-%m-%d %H:%M'))
-                with col2:
-                    st.metric("Last Measurement", last_measurement.strftime('%Y-%m-%d %H:%M'))
-                with col3:
-                    st.metric("Time Span (days)", total_days)
+        # Plots, statistics and tables rerun on their own when wavelengths change
+        render_results(aod_data, params, st.session_state['download_id'], processor, plotter)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,5 +1,7 @@
 """Configuration settings for the AERONET Explorer app."""
 
+import os
+
 # AERONET API settings
 AERONET_BASE_URL = "https://aeronet.gsfc.nasa.gov/cgi-bin/print_web_data_v3"
 AERONET_SITES_URL = "https://aeronet.gsfc.nasa.gov/aeronet_locations_v3.txt"
@@ -30,6 +32,8 @@ DEFAULT_PLOT_CONFIG = {
 # Rate limiting settings
 REQUEST_DELAY = 1.0  # seconds between requests
 MAX_REQUESTS_PER_MINUTE = 8
+MAX_RATE_LIMIT_WAIT = 30.0  # seconds a request may queue before failing
 
 # Cache settings
-CACHE_EXPIRY_HOURS = 24
\ No newline at end of file
+CACHE_EXPIRY_HOURS = 24
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aeronet_explorer")
\ No newline at end of file
@@ -1,35 +1,67 @@
 """AERONET API client for downloading aerosol data."""
 
-import requests
+import httpx
 import pandas as pd
 from datetime import datetime
 from io import StringIO
-import time
 import streamlit as st
+import threading
+import time
 from typing import Optional, Dict, Any
 import logging
 
+from config.settings import MAX_REQUESTS_PER_MINUTE, MAX_RATE_LIMIT_WAIT, CACHE_EXPIRY_HOURS
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    """Token bucket allowing bursts of up to ``per_minute`` requests."""
+    
+    def __init__(self, per_minute: int, max_wait: float = MAX_RATE_LIMIT_WAIT):
+        self.capacity = per_minute
+        self.max_wait = max_wait
+        self.rate = per_minute / 60.0  # tokens per second
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        # State may be touched from several threads (Streamlit sessions)
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent, failing fast if the queue is too long."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve a token; a negative balance is the wait owed to the bucket
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            
+            if wait > self.max_wait:
+                # Give the token back so rejected requests don't add to the debt
+                self._tokens += 1
+                raise Exception(f"Rate limited, retry in {wait:.0f}s")
+        
+        if wait:
+            time.sleep(wait)
+
 class AeronetAPI:
     """Client for AERONET web service API."""
     
     def __init__(self, base_url: str = "https://aeronet.gsfc.nasa.gov/cgi-bin/print_web_data_v3"):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'AERONET-Explorer/1.0 (Streamlit App)'
-        })
-        self.last_request_time = 0
-        
-    def _respect_rate_limit(self, delay: float = 1.0):
-        """Ensure we don't exceed rate limits."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < delay:
-            time.sleep(delay - elapsed)
-        self.last_request_time = time.time()
+        }
+        self.rate_limiter = RateLimiter(MAX_REQUESTS_PER_MINUTE)
+        # Long-lived HTTP/2 client so connections are reused between downloads
+        self.client = httpx.Client(
+            http2=True,
+            headers=self.headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16)
+        )
     
     @st.cache_data(ttl=3600)  # Cache for 1 hour
     def get_sites_list(_self) -> pd.DataFrame:
@@ -37,32 +69,54 @@ class AeronetAPI:
         sites_url = "https://aeronet.gsfc.nasa.gov/aeronet_locations_v3.txt"
         
         try:
-            response = requests.get(sites_url)
+            response = _self.client.get(sites_url)
             response.raise_for_status()
+            sites_text = response.text
             
-            # Parse the sites file
-            lines = response.text.strip().split('\n')
-            sites_data = []
+            # Parse the sites file (skip title line and header)
+            df = pd.read_csv(
+                StringIO(sites_text),
+                skiprows=2,
+                header=None,
+                names=['Site_Name', 'Longitude', 'Latitude', 'Elevation'],
+                usecols=range(4),
+                dtype={
+                    'Site_Name': 'string',
+                    'Longitude': 'float32',
+                    'Latitude': 'float32',
+                    'Elevation': 'float32'
+                }
+            ).dropna(subset=['Site_Name', 'Longitude', 'Latitude']).fillna({'Elevation': 0.0})
+            df['Site_Name'] = df['Site_Name'].str.strip()
             
-            for line in lines[1:]:  # Skip header
-                if line.strip():
-                    parts = line.split(',')
-                    if len(parts) >= 4:
-                        sites_data.append({
-                            'Site_Name': parts[0].strip(),
-                            'Longitude': float(parts[1].strip()),
-                            'Latitude': float(parts[2].strip()),
-                            'Elevation': float(parts[3].strip()) if parts[3].strip() else 0.0
-                        })
-            
-            return pd.DataFrame(sites_data)
+            return df
             
         except Exception as e:
             logger.error(f"Error fetching sites list: {e}")
             # Return empty DataFrame if fetch fails
             return pd.DataFrame(columns=['Site_Name', 'Longitude', 'Latitude', 'Elevation'])
     
-    def get_aod_data(self, start_date: str, end_date: str, site: str, 
+    def _find_data_start(self, text: str) -> int:
+        """Return the character offset of the CSV header line in an AERONET response."""
+        for marker in ('Date(dd:mm:yyyy)', 'Date_'):
+            if text.startswith(marker):
+                return 0
+            offset = text.find('\n' + marker)
+            if offset >= 0:
+                return offset + 1
+        
+        # No proper header found, assume data starts after first few lines
+        data_start = 0
+        for _ in range(6):
+            next_line = text.find('\n', data_start)
+            if next_line < 0:
+                break
+            data_start = next_line + 1
+        
+        return data_start
+    
+    @st.cache_data(ttl=CACHE_EXPIRY_HOURS * 3600, show_spinner=False, max_entries=64)
+    def get_aod_data(_self, start_date: str, end_date: str, site: str, 
                      data_level: str = "15", avg_type: str = "10") -> pd.DataFrame:
         """
         Download AERONET AOD data.
@@ -77,8 +131,6 @@ class AeronetAPI:
         Returns:
             DataFrame with AERONET data
         """
-        self._respect_rate_limit()
-        
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
         end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         
@@ -95,53 +147,44 @@ class AeronetAPI:
             'if_no_html': 1
         }
         
+        _self.rate_limiter.acquire()
+        
         try:
             logger.info(f"Requesting data for {site} from {start_date} to {end_date}")
-            response = self.session.get(self.base_url, params=params, timeout=30)
+            response = _self.client.get(_self.base_url, params=params)
             response.raise_for_status()
+            response_text = response.text
             
-            if not response.text.strip():
+            if not response_text.strip():
                 return pd.DataFrame()
             
-            # Parse CSV data
-            lines = response.text.strip().split('\n')
-            
-            # Find the data start (skip metadata)
-            data_start = 0
-            for i, line in enumerate(lines):
-                if line.startswith('Date(dd:mm:yyyy)') or line.startswith('Date_'):
-                    data_start = i
-                    break
-            
-            if data_start == 0:
-                # No proper header found, assume data starts after first few lines
-                data_start = min(6, len(lines) - 1)
-            
-            # Read the data
-            data_text = '\n'.join(lines[data_start:])
-            df = pd.read_csv(StringIO(data_text))
+            # Read the data from the header line onwards (skip metadata)
+            data_start = _self._find_data_start(response_text)
+            df = pd.read_csv(StringIO(response_text[data_start:]), engine='c', low_memory=False)
             
             # Clean up the dataframe
             if not df.empty:
                 # Convert date columns to datetime
+                # Parse dates (cached, many rows share a day) and add times as offsets
                 if 'Date(dd:mm:yyyy)' in df.columns:
-                    df['datetime'] = pd.to_datetime(df['Date(dd:mm:yyyy)'] + ' ' + df['Time(hh:mm:ss)'], 
-                                                  format='%d:%m:%Y %H:%M:%S')
+                    dates = pd.to_datetime(df['Date(dd:mm:yyyy)'], format='%d:%m:%Y', cache=True)
+                    df['datetime'] = dates + pd.to_timedelta(df['Time(hh:mm:ss)'])
                 elif any('Date_' in col for col in df.columns):
                     date_col = [col for col in df.columns if 'Date_' in col][0]
                     time_col = [col for col in df.columns if 'Time_' in col][0] if any('Time_' in col for col in df.columns) else None
+                    dates = pd.to_datetime(df[date_col], cache=True)
                     if time_col:
-                        df['datetime'] = pd.to_datetime(df[date_col] + ' ' + df[time_col])
+                        df['datetime'] = dates + pd.to_timedelta(df[time_col])
                     else:
-                        df['datetime'] = pd.to_datetime(df[date_col])
+                        df['datetime'] = dates
                 
-                # Sort by datetime
-                if 'datetime' in df.columns:
-                    df = df.sort_values('datetime')
+                # Sort by datetime (AERONET output is usually already ordered)
+                if 'datetime' in df.columns and not df['datetime'].is_monotonic_increasing:
+                    df = df.sort_values('datetime', kind='mergesort', ignore_index=True)
             
             return df
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Request error: {e}")
             raise Exception(f"Failed to fetch data: {e}")
         except Exception as e:
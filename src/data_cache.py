@@ -0,0 +1,80 @@
+"""On-disk Parquet cache for cleaned AERONET data."""
+
+import hashlib
+import os
+import time
+import uuid
+import pandas as pd
+from typing import Optional, Dict, Any
+import logging
+
+from config.settings import CACHE_DIR, CACHE_EXPIRY_HOURS
+
+logger = logging.getLogger(__name__)
+
+# Temporary files older than this are left over from interrupted writes
+TMP_FILE_MAX_AGE_SECONDS = 600
+
+class AeronetDataCache:
+    """Persist cleaned AOD DataFrames as Parquet files keyed by request parameters."""
+    
+    def __init__(self, cache_dir: str = CACHE_DIR, expiry_hours: float = CACHE_EXPIRY_HOURS):
+        self.cache_dir = cache_dir
+        self.expiry_seconds = expiry_hours * 3600
+    
+    def _cache_path(self, params: Dict[str, Any]) -> str:
+        """Return the cache file path for a set of request parameters."""
+        key = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+    
+    def load(self, params: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Return cached data for the parameters, or None if missing or expired."""
+        path = self._cache_path(params)
+        
+        try:
+            if time.time() - os.path.getmtime(path) > self.expiry_seconds:
+                os.remove(path)
+                return None
+            return pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading cached data: {e}")
+            return None
+    
+    def _sweep(self):
+        """Delete expired cache files and stale temporary files from the cache directory."""
+        now = time.time()
+        
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.parquet'):
+                max_age = self.expiry_seconds
+            elif entry.name.endswith('.tmp'):
+                max_age = TMP_FILE_MAX_AGE_SECONDS
+            else:
+                continue
+            
+            try:
+                if now - entry.stat().st_mtime > max_age:
+                    os.remove(entry.path)
+            except OSError:
+                # Another session may have replaced or removed the file already
+                pass
+    
+    def save(self, params: Dict[str, Any], df: pd.DataFrame):
+        """Write data for the parameters to the cache, ignoring failures."""
+        path = self._cache_path(params)
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._sweep()
+            df.to_parquet(tmp_path, compression='snappy', index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Error writing cached data: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -2,9 +2,27 @@
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, FrozenSet
+from functools import lru_cache
 import re
 
+# Matches AOD column labels such as AOD_440nm or AOD500
+AOD_COLUMN_PATTERN = re.compile(r'AOD_?(\d{3,4})', flags=re.IGNORECASE)
+
+
+@lru_cache(maxsize=32)
+def _extract_from_cols(columns: Tuple, wavelengths: FrozenSet[int]) -> Dict[int, str]:
+    """Map wavelengths to AOD column names for a tuple of column labels."""
+    matches = pd.Series(columns, dtype=object).str.extract(AOD_COLUMN_PATTERN, expand=False)
+    matches = matches.dropna().astype(int)
+    matches = matches[matches.isin(wavelengths)]
+    
+    # Keep the first match so derived columns (e.g. N[AOD_440nm]) don't win
+    matches = matches[~matches.duplicated()]
+    
+    return {int(wavelength): columns[i] for i, wavelength in matches.items()}
+
+
 class AeronetDataProcessor:
     """Process and clean AERONET data."""
     
@@ -13,56 +31,63 @@ class AeronetDataProcessor:
     
     def extract_aod_columns(self, df: pd.DataFrame) -> Dict[int, str]:
         """Extract AOD columns and map wavelengths to column names."""
-        aod_columns = {}
-        
-        for col in df.columns:
-            for wavelength in self.aod_wavelengths:
-                # Look for columns like AOD_440nm, AOD500, etc.
-                if str(wavelength) in col and 'AOD' in col.upper():
-                    aod_columns[wavelength] = col
-                    break
-        
-        return aod_columns
+        return dict(_extract_from_cols(tuple(df.columns), frozenset(self.aod_wavelengths)))
     
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and validate AERONET data."""
         if df.empty:
             return df
         
-        df_clean = df.copy()
-        
-        # Replace invalid values with NaN
-        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-        df_clean[numeric_cols] = df_clean[numeric_cols].replace([-999, -999.0, 'N/A'], np.nan)
+        # Replace invalid values with NaN in a single pass over the numeric block
+        numeric = df.select_dtypes(include=[np.number])
+        df_clean = df.copy(deep=False)
+        df_clean[numeric.columns] = numeric.mask(numeric == -999)
         
         # Remove rows where all AOD values are NaN
         aod_cols = self.extract_aod_columns(df_clean)
         if aod_cols:
             aod_col_names = list(aod_cols.values())
-            df_clean = df_clean.dropna(subset=aod_col_names, how='all')
+            has_aod = df_clean[aod_col_names].notna().to_numpy().any(axis=1)
+            df_clean = df_clean.loc[has_aod]
+        
+        # Downcast numbers; AOD values carry ~3 decimals so float32 is ample
+        float_cols = df_clean.select_dtypes(include=['float64']).columns
+        int_cols = df_clean.select_dtypes(include=['int64']).columns
+        df_clean = df_clean.astype(dict.fromkeys(float_cols, np.float32))
+        df_clean[int_cols] = df_clean[int_cols].apply(pd.to_numeric, downcast='integer')
         
         return df_clean
     
     def calculate_statistics(self, df: pd.DataFrame, wavelength: int) -> Dict:
         """Calculate basic statistics for AOD data at specific wavelength."""
+        return self.calculate_statistics_batch(df, [wavelength]).get(wavelength, {})
+    
+    def calculate_statistics_batch(self, df: pd.DataFrame, wavelengths: List[int]) -> Dict[int, Dict]:
+        """Calculate basic statistics for several wavelengths in one pass."""
         aod_cols = self.extract_aod_columns(df)
+        selected = {w: aod_cols[w] for w in wavelengths if w in aod_cols}
         
-        if wavelength not in aod_cols:
+        if not selected:
             return {}
         
-        col_name = aod_cols[wavelength]
-        data = df[col_name].dropna()
+        desc = df[list(selected.values())].describe(percentiles=[0.25, 0.5, 0.75]).T
         
-        if data.empty:
-            return {}
+        stats_dict = {}
+        for wavelength, col_name in selected.items():
+            stats = desc.loc[col_name]
+            if stats['count'] == 0:
+                stats_dict[wavelength] = {}
+                continue
+            
+            stats_dict[wavelength] = {
+                'count': int(stats['count']),
+                'mean': stats['mean'],
+                'median': stats['50%'],
+                'std': stats['std'],
+                'min': stats['min'],
+                'max': stats['max'],
+                'q25': stats['25%'],
+                'q75': stats['75%']
+            }
         
-        return {
-            'count': len(data),
-            'mean': data.mean(),
-            'median': data.median(),
-            'std': data.std(),
-            'min': data.min(),
-            'max': data.max(),
-            'q25': data.quantile(0.25),
-            'q75': data.quantile(0.75)
-        }
\ No newline at end of file
+        return stats_dict
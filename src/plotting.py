@@ -7,6 +7,19 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 
+# Series longer than this are drawn with WebGL instead of SVG
+WEBGL_MIN_POINTS = 2000
+# Series longer than this are thinned to roughly THINNED_POINTS markers
+THIN_MIN_POINTS = 20000
+THINNED_POINTS = 5000
+# Site counts at which map clusters step up to the next circle radius
+CLUSTER_STEPS = [10, 50]
+
+
+def _cluster_size(n: int) -> float:
+    """Circle radius in pixels for a cluster of n sites, growing logarithmically."""
+    return float(3.5 + 5 * np.log2(n + 1))
+
 class AeronetPlotter:
     """Create plots for AERONET data."""
     
@@ -14,8 +27,9 @@ class AeronetPlotter:
         self.default_colors = px.colors.qualitative.Set1
         
     def plot_aod_timeseries(self, df: pd.DataFrame, aod_columns: Dict[int, str], 
-                           selected_wavelengths: List[int], title: str = "") -> go.Figure:
-        """Create time series plot of AOD data."""
+                           selected_wavelengths: List[int], title: str = "",
+                           masks: Optional[Dict[int, np.ndarray]] = None) -> go.Figure:
+        """Create time series plot of AOD data, optionally using precomputed valid masks."""
         fig = go.Figure()
         
         if df.empty or not aod_columns:
@@ -27,16 +41,30 @@ class AeronetPlotter:
             )
             return fig
         
+        # Shared time axis, converted once for all traces
+        x_all = df['datetime'].to_numpy()
+        
         # Add traces for selected wavelengths
         for i, wavelength in enumerate(selected_wavelengths):
             if wavelength in aod_columns:
                 col_name = aod_columns[wavelength]
-                data = df[['datetime', col_name]].dropna()
+                y_all = df[col_name].to_numpy()
+                if masks is not None and wavelength in masks:
+                    mask = masks[wavelength]
+                else:
+                    mask = ~pd.isna(y_all)
+                x = x_all[mask]
+                y = y_all[mask]
                 
-                if not data.empty:
-                    fig.add_trace(go.Scatter(
-                        x=data['datetime'],
-                        y=data[col_name],
+                if len(y):
+                    if len(y) > THIN_MIN_POINTS:
+                        step = len(y) // THINNED_POINTS
+                        x, y = x[::step], y[::step]
+                    
+                    scatter = go.Scattergl if len(y) >= WEBGL_MIN_POINTS else go.Scatter
+                    fig.add_trace(scatter(
+                        x=x,
+                        y=y,
                         mode='markers+lines',
                         name=f'AOD {wavelength}nm',
                         line=dict(color=self.default_colors[i % len(self.default_colors)]),
@@ -92,12 +120,19 @@ class AeronetPlotter:
         """Create map showing AERONET sites."""
         fig = go.Figure()
         
-        # Add all sites
+        # Add all sites, clustered so nearby markers merge at low zoom
         fig.add_trace(go.Scattermapbox(
             lat=sites_df['Latitude'],
             lon=sites_df['Longitude'],
             mode='markers',
             marker=dict(size=8, color='lightblue'),
+            cluster=dict(
+                enabled=True,
+                color='lightblue',
+                opacity=0.8,
+                step=CLUSTER_STEPS,
+                size=[_cluster_size(n) for n in [2] + CLUSTER_STEPS]
+            ),
             text=sites_df['Site_Name'],
             name='AERONET Sites',
             hovertemplate='<b>%{text}</b><br>' +